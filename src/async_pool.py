@@ -0,0 +1,123 @@
+from __future__ import annotations
+import asyncio
+import queue
+from contextlib import AsyncExitStack
+from typing import TYPE_CHECKING
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+
+from worker import Worker, ConnectionPool
+
+try:
+    # httpx only speaks HTTP/2 when h2 is installed
+    import h2
+    import httpx
+except ImportError:
+    httpx = None
+
+if TYPE_CHECKING:
+    from typing import Callable, Coroutine, List
+    from task import Download
+
+class EventLoop(Worker):
+    """Worker thread running a coroutine on its own asyncio event loop.
+    """
+
+    def __init__(self, main: Callable[[], Coroutine]) -> None:
+        super().__init__()
+        self.main = main
+
+    def run(self):
+        asyncio.run(self.main())
+
+class AsyncConnectionPool(ConnectionPool):
+    """asyncio/aiobotocore counterpart of ConnectionPool.
+
+    A single event loop thread streams every download through one aiobotocore
+    client and aiofiles, with at most max_workers downloads in flight at a
+    time, instead of one OS thread and boto3 client per worker. Progress is
+    reported through an asyncio.Queue drained by a single consumer coroutine.
+
+    With use_http2 set and httpx installed, whole-object GETs go to presigned
+    URLs over a single HTTP/2 httpx client instead, so many small files share
+    one TLS connection rather than paying a handshake each.
+    """
+
+    def new_workers(self, task_queue: queue.Queue, max_workers: int) -> List[Worker]:
+        return [EventLoop(self.run_downloads)]
+
+    def new_http_client(self) -> httpx.AsyncClient:
+        """Returns an HTTP/2 client, or None when disabled or httpx is missing."""
+        if not self.use_http2 or httpx is None:
+            return None
+        return httpx.AsyncClient(http2=True, limits=httpx.Limits(max_connections=max(100, self.max_workers)))
+
+    async def run_downloads(self) -> None:
+        loop = asyncio.get_running_loop()
+        session = get_session()
+        async with AsyncExitStack() as stack:
+            client = await stack.enter_async_context(
+                session.create_client('s3',
+                                      region_name=self.region_name,
+                                      endpoint_url=self.endpoint_url,
+                                      aws_access_key_id=self.access_key,
+                                      aws_secret_access_key=self.secret_key,
+                                      config=AioConfig(max_pool_connections=max(50, self.max_workers * 4, self.max_concurrency))))
+            http = self.new_http_client()
+            if http is not None:
+                await stack.enter_async_context(http)
+            semaphore = asyncio.Semaphore(self.max_workers)
+            progress: asyncio.Queue = asyncio.Queue()
+            reporter = asyncio.create_task(self.report_progress(progress))
+            fetches = set()
+            while not self.stop_event.is_set():
+                # task_queue is bounded and fed while we download, wait for the next one off the loop
+                download = await loop.run_in_executor(None, self.next_task)
+                if download is None:
+                    break
+                # take the slot before creating the task, so a full pool stops draining task_queue
+                await semaphore.acquire()
+                fetch = asyncio.create_task(self.fetch(client, http, semaphore, progress, download))
+                fetches.add(fetch)
+                fetch.add_done_callback(fetches.discard)
+            await asyncio.gather(*fetches)
+            await progress.put(None)
+            await reporter
+
+    def next_task(self) -> Download:
+        """Returns the next queued download, or None once the queue is closed
+           or the pool is stopped.
+
+        Gets time out regularly to check stop_event, stop() cannot always
+        queue a sentinel into a full task_queue.
+        """
+        while not self.stop_event.is_set():
+            try:
+                return self.task_queue.get(timeout=0.25)
+            except queue.Empty:
+                continue
+        return None
+
+    async def fetch(self, client, http: httpx.AsyncClient, semaphore: asyncio.Semaphore, progress: asyncio.Queue, download: Download) -> None:
+        """Runs download, releasing the semaphore slot acquired by run_downloads."""
+        try:
+            if self.stop_event.is_set():
+                return
+            # presigning is local SigV4 with the shared boto3 client, no request is made
+            await download.start_async(client, progress, http=http, signer=self.client)
+        except Exception as e:
+            print(f'Download {download.id} failed: {download.bucket} {download.key}')
+            print(e)
+            download.complete(e)
+        finally:
+            semaphore.release()
+
+    async def report_progress(self, progress: asyncio.Queue) -> None:
+        """Forwards (download, bytes) updates to Download.progress until a None sentinel."""
+        while True:
+            update = await progress.get()
+            if update is None:
+                break
+            download, new_bytes = update
+            download.progress(new_bytes)
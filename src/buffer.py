@@ -0,0 +1,67 @@
+from __future__ import annotations
+import mmap
+import queue
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import threading
+    from typing import BinaryIO, Optional
+
+# seconds between cancel checks while waiting for a free buffer
+ACQUIRE_POLL_INTERVAL = 0.25
+
+class BufferPool:
+    """Fixed set of equally sized buffers carved out of a single mmap arena.
+
+    The arena is page aligned, so the buffers can be handed to O_DIRECT
+    writes, which reject the arbitrarily aligned memory of bytes objects.
+    Buffers are handed out as writable memoryviews and returned with release()
+    once their contents have been written, acquire() blocks while all are in use.
+
+    Attributes:
+        count: Integer count of buffers in the pool.
+        size: Integer size in bytes of each buffer.
+    """
+
+    def __init__(self, count: int, size: int) -> None:
+        self.count = count
+        self.size = size
+        self._arena = mmap.mmap(-1, count * size)
+        self._free: queue.SimpleQueue = queue.SimpleQueue()
+
+        view = memoryview(self._arena)
+        for i in range(count):
+            self._free.put(view[i * size:(i + 1) * size])
+
+    def acquire(self, cancel: threading.Event=None) -> Optional[memoryview]:
+        """Returns a free buffer, blocking until one is released.
+
+        Returns None instead once cancel is set, so callers waiting on buffers
+        held by a failed transfer do not block forever.
+        """
+        while True:
+            try:
+                return self._free.get(timeout=ACQUIRE_POLL_INTERVAL)
+            except queue.Empty:
+                if cancel is not None and cancel.is_set():
+                    return None
+
+    def release(self, buf: memoryview) -> None:
+        """Returns buf to the pool."""
+        self._free.put(buf)
+
+def read_into(stream: BinaryIO, view: memoryview) -> int:
+    """Copies reads from stream into view until it is full, returning fewer
+       bytes than len(view) only at end of stream.
+
+    StreamingBody has no real readinto, so this costs one copy per chunk and
+    is only worth it where the destination must be an aligned buffer.
+    """
+    filled = 0
+    while filled < len(view):
+        data = stream.read(len(view) - filled)
+        if not data:
+            break
+        view[filled:filled + len(data)] = data
+        filled += len(data)
+    return filled
@@ -1,13 +1,37 @@
+from __future__ import annotations
 from typing import TYPE_CHECKING
 
+from boto3.s3.transfer import TransferConfig
+
 if TYPE_CHECKING:
-    from typing import List
+    from typing import Dict, Tuple
+
+MB = 1024 * 1024
+
+# a single S3 connection needs requests of at least ~16 MB to reach its
+# throughput ceiling, smaller objects are fetched with a single GET
+DEFAULT_MULTIPART_THRESHOLD = 16 * MB
+DEFAULT_MULTIPART_CHUNKSIZE = 16 * MB
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_IO_CHUNKSIZE = 1 * MB
+DEFAULT_MAX_IO_QUEUE = 10000
+DEFAULT_PROGRESS_INTERVAL = 2.0
+DEFAULT_RANGE_THRESHOLD = 256 * MB
 
 class Boto3Config:
     """Boto3 Client configuration object/loader.
 
     Attributes:
         bucket: String containing Digital Ocean Spaces bucket name.
+        multipart_threshold: Integer size in bytes above which downloads are split into parts.
+        multipart_chunksize: Integer size in bytes of each part of a multipart download.
+        max_concurrency: Integer count of parallel ranged GETs issued per download.
+        io_chunksize: Integer size in bytes of each read from a response body.
+        max_io_queue: Integer count of chunks allowed to wait for disk writes.
+        range_threshold: Integer size in bytes above which downloads use byte-range GETs written with pwrite.
+        use_uring: Boolean, submit byte-range writes through io_uring when the liburing 2024.x bindings are installed.
+        use_http2: Boolean, stream single GETs over one multiplexed HTTP/2 connection when httpx and h2 are installed.
+        progress_interval: Float number of seconds between two progress refreshes.
     """
 
     def __init__(self):
@@ -18,17 +42,39 @@ class Boto3Config:
         self.region_name = config.get('REGION_NAME')
         self.endpoint_url = config.get('ENDPOINT')
 
+        self.multipart_threshold = int(config.get('MULTIPART_THRESHOLD', DEFAULT_MULTIPART_THRESHOLD))
+        self.multipart_chunksize = int(config.get('MULTIPART_CHUNKSIZE', DEFAULT_MULTIPART_CHUNKSIZE))
+        self.max_concurrency = int(config.get('MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+        self.io_chunksize = int(config.get('IO_CHUNKSIZE', DEFAULT_IO_CHUNKSIZE))
+        self.max_io_queue = int(config.get('MAX_IO_QUEUE', DEFAULT_MAX_IO_QUEUE))
+        self.range_threshold = int(config.get('RANGE_THRESHOLD', DEFAULT_RANGE_THRESHOLD))
+        self.use_uring = config.get('USE_URING', '').lower() in ('1', 'true', 'yes')
+        self.use_http2 = config.get('USE_HTTP2', '').lower() in ('1', 'true', 'yes')
+        self.progress_interval = float(config.get('PROGRESS_INTERVAL', DEFAULT_PROGRESS_INTERVAL))
+
         #self.root_folder = config.get('ROOT_FOLDER')
         #self.dest_folder = config.get('DEST_FOLDER')
 
-    def load_config(self):
+    def load_config(self) -> Dict[str, str]:
+        """Parses KEY=VALUE lines from boto3.conf, splitting on the first '=' only."""
         try:
             with open('boto3.conf', 'r') as f:
-                env: List[str] = []
-                lines = f.read().splitlines()
-                for line in lines:
-                    env += line.split('=')
-                env = iter(env)
-                return dict(zip(env,env))
+                return dict(self._parse_line(line) for line in f
+                            if '=' in line and not line.lstrip().startswith('#'))
         except FileNotFoundError:
             print('Config file missing')
+            return {}
+
+    @staticmethod
+    def _parse_line(line: str) -> Tuple[str, str]:
+        key, _, value = line.partition('=')
+        return key.strip(), value.strip()
+
+    def new_transfer_config(self, max_concurrency: int=None) -> TransferConfig:
+        """Returns a TransferConfig for parallel multipart downloads."""
+        return TransferConfig(multipart_threshold=self.multipart_threshold,
+                              multipart_chunksize=self.multipart_chunksize,
+                              max_concurrency=max_concurrency or self.max_concurrency,
+                              io_chunksize=self.io_chunksize,
+                              max_io_queue=self.max_io_queue,
+                              use_threads=True)
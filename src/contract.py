@@ -1,4 +1,4 @@
-import uuid
+import os
 
 class Contract:
     """File metadata for Download Manager request object.
@@ -9,14 +9,20 @@ class Contract:
         key: String containing where the remote file is located inside bucket.
         filename: Path like string object containing where to store download.
         extra_args: Dict containing any extra arguments to supply 'download_file' method.
+        size: Integer size of the remote file in bytes, None if not yet known.
+        etag: String ETag of the remote file the size belongs to, None if not yet known.
     """
 
-    def __init__(self, bucket: str, key: str, filename: str, extra_args: dict) -> None:
-        self.id = str(uuid.uuid4())[:8]
+    __slots__ = ('id', 'bucket', 'key', 'filename', 'extra_args', 'size', 'etag')
+
+    def __init__(self, bucket: str, key: str, filename: str, extra_args: dict, size: int=None, etag: str=None) -> None:
+        self.id = os.urandom(4).hex()
         self.bucket = bucket
         self.key = key
         self.filename = filename
         self.extra_args = extra_args
+        self.size = size
+        self.etag = etag
 
 class ContractFactory:
     """Factory class for creating contracts.
@@ -28,9 +34,10 @@ class ContractFactory:
     def __init__(self, bucket: str) -> None:
         self.bucket = bucket
 
-    def new(self, key: str, filename: str, extra_args: dict=None) -> Contract:
+    def new(self, key: str, filename: str, extra_args: dict=None, size: int=None) -> Contract:
         """Returns a new Contract object."""
         return Contract(self.bucket,
                         key,
                         filename,
-                        extra_args)
+                        extra_args,
+                        size)
@@ -7,10 +7,11 @@ def logger_factory(logger_name: str) -> logging.Logger:
     
     logger = logging.getLogger(logger_name)
     logger.setLevel(logging.DEBUG)
+    # handlers are attached directly, don't emit records a second time through root
+    logger.propagate = False
     
+    # one shared file handler per process, opened once instead of once per level
     attach_file_handler(logger, logging.DEBUG)
-    attach_file_handler(logger, logging.INFO)
-    attach_file_handler(logger, logging.WARNING)
 
     attach_console_handler(logger, logging.DEBUG)
 
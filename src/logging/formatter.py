@@ -1,25 +1,41 @@
 import logging
 import datetime
+import time
 
-class LogFormatterForFiles(logging.Formatter):
+class CachedSecondFormatter(logging.Formatter):
+    """Formats record timestamps as ISO 8601 UTC, reusing the formatted
+       second between records.
+
+    Attributes:
+        _prefix_format: String time.strftime pattern for the part of the timestamp up to the second.
+    """
+
+    _prefix_format = "%Y-%m-%dT%H:%M:%S"
+
+    # (second, formatted prefix) of the last record, records within the same
+    # second only need their microseconds formatted
+    _cached = (None, '')
 
     def formatTime(self, record, datefmt=None):
         # timestamps follow ISO 8601 UTC
-        date = datetime.datetime.fromtimestamp(record.created).astimezone(datetime.timezone.utc)
-        if not datefmt:
-            datefmt = "%Y%m%dT%H%M%S.%fZ"
-        return date.strftime(datefmt)
+        if datefmt:
+            date = datetime.datetime.fromtimestamp(record.created).astimezone(datetime.timezone.utc)
+            return date.strftime(datefmt)
+        second = int(record.created)
+        cached_second, prefix = self._cached
+        if second != cached_second:
+            prefix = time.strftime(self._prefix_format, time.gmtime(second))
+            self._cached = (second, prefix)
+        return f"{prefix}.{int((record.created - second) * 1e6):06d}Z"
+
+class LogFormatterForFiles(CachedSecondFormatter):
+
+    _prefix_format = "%Y%m%dT%H%M%S"
 
 file_formatter = LogFormatterForFiles(fmt="%(asctime)22s | %(levelname)8s | %(name)s | %(message)s")
 
-class LogFormatterForConsole(logging.Formatter):
+class LogFormatterForConsole(CachedSecondFormatter):
 
-    def formatTime(self, record, datefmt=None):
-        # timestamps follow ISO 8601 UTC
-        date = datetime.datetime.fromtimestamp(record.created).astimezone(datetime.timezone.utc)
-        if not datefmt:
-            datefmt = "%Y-%m-%d %H:%M:%S.%fZ"
-        return date.strftime(datefmt)
+    _prefix_format = "%Y-%m-%d %H:%M:%S"
 
 console_formatter = LogFormatterForConsole(fmt="%(asctime)26s | %(levelname).1s | %(name)s | %(message)s")
-
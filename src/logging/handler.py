@@ -1,26 +1,35 @@
 import sys
-import os
 import datetime
 import logging
 
 from formatter import file_formatter, console_formatter
 
+# handlers are shared by every logger, keyed by (target, level)
+_handlers = {}
+
 def attach_file_handler(logger: logging.Logger, logging_level: int) -> None:
 
-        timestamp = datetime.datetime.utcnow().strftime("%Y%m%d")
-        PID = os.getpid()
+        timestamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d")
         _logfile_path = f"boto3_stream_server_log_{timestamp}.{logging.getLevelName(logging_level)}.log"
 
-        file_handler = logging.FileHandler(_logfile_path)
-        file_handler.setFormatter(file_formatter)
-        file_handler.setLevel(logging_level)
+        file_handler = _handlers.get((_logfile_path, logging_level))
+        if file_handler is None:
+            file_handler = logging.FileHandler(_logfile_path)
+            file_handler.setFormatter(file_formatter)
+            file_handler.setLevel(logging_level)
+            _handlers[(_logfile_path, logging_level)] = file_handler
 
-        logger.addHandler(file_handler)
+        if file_handler not in logger.handlers:
+            logger.addHandler(file_handler)
 
 def attach_console_handler(logger: logging.Logger, logging_level: int) -> None:
 
-    console_stderr_handler = logging.StreamHandler(sys.stderr)
-    console_stderr_handler.setFormatter(console_formatter)
-    console_stderr_handler.setLevel(logging_level)
+    console_stderr_handler = _handlers.get(('stderr', logging_level))
+    if console_stderr_handler is None:
+        console_stderr_handler = logging.StreamHandler(sys.stderr)
+        console_stderr_handler.setFormatter(console_formatter)
+        console_stderr_handler.setLevel(logging_level)
+        _handlers[('stderr', logging_level)] = console_stderr_handler
     
-    logger.addHandler(console_stderr_handler)
\ No newline at end of file
+    if console_stderr_handler not in logger.handlers:
+        logger.addHandler(console_stderr_handler)
@@ -1,15 +1,18 @@
 from __future__ import annotations
+import threading
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from task import Task, Download
-    from typing import Type, List
+    from task import Task
+    from typing import Type, Tuple
 
 class Observer:
     """The Obvserver interface declares the update method, used by downloads.
     """
 
+    __slots__ = ('_callback',)
+
     def __init__(self, callback=None) -> None:
         self._callback = callback
 
@@ -18,40 +21,36 @@ class Observer:
         """
         raise NotImplementedError
 
+# attach/detach are rare, one lock for every Observable keeps instances small
+_observers_lock = threading.Lock()
+
 class Observable:
-    """Interface declaring methods for managing subscribers.                                                                                                                  
-    """                   
+    """Interface declaring methods for managing subscribers.
+
+    Observers are kept as an immutable tuple rebuilt on attach/detach, so
+    notify() iterates a snapshot without locking.
+    """
+
+    __slots__ = ('_observers',)
 
     def __init__(self):
-        self._observers: List = []
+        self._observers: Tuple = ()
 
     def attach(self, observer: Observer) -> None:
-        """Attach an observer to the subscriber.                                                                                                                              
+        """Attach an observer to the subscriber.
         """
-        if not observer in self._observers:
-            self._observers.append(observer)
+        with _observers_lock:
+            if observer not in self._observers:
+                self._observers = self._observers + (observer,)
 
     def detach(self, observer: Observer) -> None:
-        """Detach an observer from the subscriber.                                                                                                                            
+        """Detach an observer from the subscriber.
         """
-        if observer in self._observers:
-            self._observers.remove(observer)
+        with _observers_lock:
+            self._observers = tuple(ob for ob in self._observers if ob is not observer)
 
     def notify(self) -> None:
-        """Notify all observers about an event.                                                                                                                               
+        """Notify all observers about an event.
         """
         for observer in self._observers:
             observer.update(self)
-
-class DownloadCompleteObserver(Observer):
-    """Moves Download to complete_queue when fully transferred.
-    """
-
-    def update(self, download: Type[Download]) -> None:
-        if download._bytes_transferred == download._size:
-            return self._callback()
-
-class ProgressObserver(Observer):
-    """Updates progress_map with progress information.
-    """
-    pass
\ No newline at end of file
@@ -2,30 +2,126 @@ from __future__ import annotations
 import os
 import sys
 import queue
+import asyncio
 import time
+import array
 import threading
 from abc import abstractmethod
-from typing import TYPE_CHECKING, Type, List, Dict
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait as futures_wait
+from typing import TYPE_CHECKING, Type, List, Dict, Tuple, Callable
 
 import boto3
+from boto3.s3.transfer import TransferConfig, TransferManager
+from s3transfer.subscribers import BaseSubscriber
+from s3transfer.utils import S3_RETRYABLE_DOWNLOAD_ERRORS
 
-from config import Boto3Config
-from observer import DownloadCompleteObserver, ProgressObserver, Observable
+from config import (Boto3Config, DEFAULT_MULTIPART_THRESHOLD, DEFAULT_MULTIPART_CHUNKSIZE, DEFAULT_MAX_CONCURRENCY,
+                    DEFAULT_IO_CHUNKSIZE, DEFAULT_MAX_IO_QUEUE, DEFAULT_RANGE_THRESHOLD)
+from observer import Observable
 from contract import Contract
 from worker import ConnectionPool
+from buffer import BufferPool, read_into
+
+try:
+    from uring import UringWriter
+except ImportError:
+    UringWriter = None
+
+try:
+    import aiofiles
+    import aiohttp
+    from async_pool import AsyncConnectionPool
+    # aiobotocore bodies stream over aiohttp, which raises its own errors when a connection breaks
+    ASYNC_RETRYABLE_DOWNLOAD_ERRORS = S3_RETRYABLE_DOWNLOAD_ERRORS + (aiohttp.ClientPayloadError,
+                                                                      aiohttp.ClientConnectionError,
+                                                                      asyncio.TimeoutError)
+except ImportError:
+    AsyncConnectionPool = None
 
 if TYPE_CHECKING:
     import Observer
     import botocore
 
+# ANSI cursor home + clear to end of screen
+CLEAR_SCREEN = "\x1b[H\x1b[J"
+
+# read size when streaming an object body to disk
+STREAM_CHUNK_SIZE = 1 << 20
+
+# O_DIRECT only pays off for large files, and needs block aligned offsets and lengths
+DIRECT_IO_THRESHOLD = 128 * 1024 * 1024
+DIRECT_IO_ALIGNMENT = 4096
+
+def open_destination(filename: str, direct: bool) -> Tuple[int, bool]:
+    """Opens filename for positional writes, bypassing the page cache with
+       O_DIRECT | O_NOATIME when direct is set and the filesystem allows it.
+
+    Returns the file descriptor and whether it was opened with O_DIRECT.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    if direct and hasattr(os, 'O_DIRECT'):
+        direct_flags = [os.O_DIRECT]
+        if hasattr(os, 'O_NOATIME'):
+            # O_NOATIME fails with EPERM unless we own the file, O_DIRECT alone may still work
+            direct_flags.insert(0, os.O_DIRECT | os.O_NOATIME)
+        for extra in direct_flags:
+            try:
+                return os.open(filename, flags | extra, 0o644), True
+            except PermissionError:
+                continue
+            except OSError:
+                # e.g. tmpfs rejects O_DIRECT
+                break
+    return os.open(filename, flags, 0o644), False
+
+def pwrite_all(fd: int, data: bytes, offset: int) -> None:
+    """Writes all of data at offset, retrying after short writes."""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+def preallocate(fd: int, size: int) -> None:
+    """Reserves size bytes for fd, falling back to a sparse truncate where
+       fallocate is unavailable or unsupported by the filesystem.
+    """
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        os.ftruncate(fd, size)
+
 class Task(Observable):
     """Interface declaring methods for managing subscribers.                                                                                                                  
     """                   
 
+    __slots__ = ()
+
     @abstractmethod
-    def start(self, client: botocore.client) -> None:
+    def start(self, manager: TransferManager) -> None:
         raise NotImplementedError
 
+class ProgressSubscriber(BaseSubscriber):
+    """s3transfer subscriber forwarding transfer progress to a Download.
+
+    When the download size is already known it is handed to the transfer
+    future, so the TransferManager skips its own head_object. Otherwise the
+    size the manager resolved is copied back onto the Download with the first
+    progress update.
+    """
+
+    def __init__(self, download: Download) -> None:
+        self._download = download
+
+    def on_queued(self, future, **kwargs) -> None:
+        if self._download._size is not None:
+            future.meta.provide_transfer_size(self._download._size)
+
+    def on_progress(self, future, bytes_transferred: int, **kwargs) -> None:
+        if self._download._size is None:
+            self._download._size = future.meta.size
+        self._download.progress(bytes_transferred)
+
 class Download(Task):
     """Class for keeping track of active downloads.
 
@@ -35,69 +131,509 @@ class Download(Task):
         key: String containing where the remote file is located inside bucket.
         filename: Path like string object containing where to store download.
         extra_args: Dict containing any extra arguments to supply 'download_file' method.
+        etag: String ETag byte-range GETs are pinned to with IfMatch, None until known.
+        transfer_config: TransferConfig object controlling multipart download concurrency.
+        range_threshold: Integer size in bytes above which the object is fetched with parallel byte-range GETs.
+        use_uring: Boolean, write byte ranges through io_uring instead of pwrite when liburing is available.
+        range_executor: ThreadPoolExecutor shared by the connection pool for byte ranges, None for a private one per download.
+        slot: Integer row of this download in the DownloadManager's ProgressTable, None until queued for a worker.
+        on_complete: Callable invoked once with this download after it has been fully written and closed, or has failed, None for no callback.
+        error: Exception the download failed with, None unless it failed.
 
         _size: Integer count representing remote file size, in bytes.
-        _bytes_transferred: Integer count representing number of bytes transferred from remote.
-        _lock: Threading.Lock object to protect access to _bytes_transferred.
-
-        _observers: List object containing all subscribed observers.
+        _bytes_transferred: Integer count representing number of bytes transferred from remote, lowered again when s3transfer retries a part.
+        _started: Float time.monotonic() reading at which the transfer started, None until then.
+        _completed: Boolean set once on_complete has been called.
+        _progress_lock: Threading.Lock serializing concurrent progress() calls.
     """
 
-    def __init__(self, contract: Contract) -> None:
+    # one Download per file, no per-instance __dict__
+    __slots__ = ('id', 'bucket', 'key', 'filename', 'extra_args', 'etag',
+                 'transfer_config', 'range_threshold', 'use_uring', 'range_executor', 'slot', 'on_complete', 'error',
+                 '_size', '_bytes_transferred', '_started', '_completed', '_progress_lock')
+
+    def __init__(self, contract: Contract, transfer_config: TransferConfig=None, range_threshold: int=DEFAULT_RANGE_THRESHOLD, use_uring: bool=False, range_executor: ThreadPoolExecutor=None, on_complete: Callable[[Download], None]=None) -> None:
         super().__init__()
         self.id = contract.id
         self.bucket = contract.bucket
         self.key = contract.key
         self.filename = contract.filename
         self.extra_args = contract.extra_args
+        self.etag = contract.etag
+        self.transfer_config = transfer_config or TransferConfig(multipart_threshold=DEFAULT_MULTIPART_THRESHOLD,
+                                                                 multipart_chunksize=DEFAULT_MULTIPART_CHUNKSIZE,
+                                                                 max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                                                                 io_chunksize=DEFAULT_IO_CHUNKSIZE,
+                                                                 max_io_queue=DEFAULT_MAX_IO_QUEUE,
+                                                                 use_threads=True)
+        self.range_threshold = range_threshold
+        self.use_uring = use_uring and UringWriter is not None
+        self.range_executor = range_executor
+        self.slot = None
+        self.on_complete = on_complete
+        self.error = None
 
+        self._size = contract.size
         self._bytes_transferred = 0
-        self._lock = threading.Lock()
+        self._started = None
+        self._completed = False
+        self._progress_lock = threading.Lock()
 
     def progress(self, new_bytes) -> None:
-        """Callback function to update newly transferred bytes on download."""
-        with self._lock:
+        """Callback function to update newly transferred bytes on download.
+
+        Called for every chunk, concurrently from s3transfer's part threads and
+        from byte-range threads. `+=` is a separate read, add and store, so it
+        is guarded by a lock: an uncontended acquire is far below the cost of
+        reading a chunk, and a lost update would leave the count short for
+        good. Progress display polls _bytes_transferred from the
+        ProgressTracker thread instead of being notified.
+
+        new_bytes is negative when s3transfer retries a part and takes back
+        the progress it had reported for it, so _bytes_transferred can
+        decrease. Readers on other threads may also see a value a few chunks
+        behind and must tolerate stale reads.
+        Completion is not derived from it: the last byte can arrive before it
+        is on disk, so start() reports completion through complete() once the
+        file has been written, truncated and closed.
+        """
+        with self._progress_lock:
             self._bytes_transferred += new_bytes
+
+    def complete(self, error: Exception=None) -> None:
+        """Calls on_complete, and any attached observers, exactly once.
+
+        Workers call it with the exception of a failed download, so failures
+        are released by the manager like successful downloads.
+        """
+        if self._completed:
+            return
+        self._completed = True
+        self.error = error
+        if self.on_complete is not None:
+            self.on_complete(self)
+        if self._observers:
+            # observers attached by callers still hear about completion
             self.notify()
 
-    def start(self, client: botocore.client) -> None:
-        """Fetches object size and initiates download."""
+    def is_complete(self) -> bool:
+        """Returns True once every byte of a known size has been transferred."""
+        size = self._size
+        return size is not None and self._bytes_transferred >= size
+
+    def start(self, manager: TransferManager) -> None:
+        """Initiates download through the shared TransferManager, or directly
+           when the object is known to be below the multipart threshold (single
+           GET) or above the range threshold (parallel byte ranges).
+
+        No head_object is issued here: the size comes from the listing cache,
+        or from the transfer itself once it starts. Completion is reported
+        once the file is closed.
+        """
+        self._started = time.monotonic()
+        if self._size is not None and self._size < self.transfer_config.multipart_threshold:
+            self.download_single(manager.client)
+        elif self._size is not None and self._size > self.range_threshold:
+            self.download_ranges(manager.client)
+        else:
+            future = manager.download(self.bucket,
+                                      self.key,
+                                      self.filename,
+                                      extra_args=self.extra_args,
+                                      subscribers=[ProgressSubscriber(self)])
+            future.result()
+        self.complete()
+
+    def download_single(self, client: botocore.client) -> None:
+        """Streams a single-part object straight to disk with one get_object,
+           skipping TransferManager scheduling.
+        """
+        body = client.get_object(Bucket=self.bucket, Key=self.key, **(self.extra_args or {}))['Body']
+        try:
+            # unbuffered, chunks are already written in 1 MiB blocks
+            with open(self.filename, 'wb', buffering=0) as f:
+                while True:
+                    chunk = body.read(STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    # raw writes may be short
+                    view = memoryview(chunk)
+                    while view:
+                        view = view[f.write(view):]
+                    self.progress(len(chunk))
+        finally:
+            # return the connection to the pool even if a write failed
+            body.close()
+
+    def open_dest(self, direct: bool=False) -> Tuple[int, bool]:
+        """Opens the destination for positional writes and preallocates _size bytes.
+
+        Returns the file descriptor and whether it was opened with O_DIRECT.
+        """
+        fd, direct = open_destination(self.filename, direct)
+        try:
+            preallocate(fd, self._size)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd, direct
+
+    def download_ranges(self, client: botocore.client) -> None:
+        """Splits the object into multipart_chunksize byte ranges fetched on
+           range_executor, each writing in place into a preallocated file.
+
+        Chunks read from the response body are written as they are. Files
+        above DIRECT_IO_THRESHOLD are written with O_DIRECT so they do not
+        flood the page cache; O_DIRECT needs aligned memory, so those chunks
+        are copied into a page aligned BufferPool first, the tail write is
+        padded to the block size and the file truncated back to its real size
+        afterwards.
+        """
+        chunk = self.transfer_config.multipart_chunksize
+        concurrency = self.transfer_config.max_concurrency
+        ranges = [(first, min(first + chunk, self._size) - 1) for first in range(0, self._size, chunk)]
+        fd, direct = self.open_dest(self._size > DIRECT_IO_THRESHOLD and chunk % DIRECT_IO_ALIGNMENT == 0)
+        align = DIRECT_IO_ALIGNMENT if direct else 1
+        writer = None
+        pool = None
+        try:
+            if direct:
+                # with io_uring each range can have one buffer in flight while reading the next
+                pool = BufferPool(concurrency * 2 if self.use_uring else concurrency, STREAM_CHUNK_SIZE)
+            if self.use_uring:
+                writer = UringWriter(fd)
+                write = writer.write
+            else:
+                def write(data, offset, done):
+                    try:
+                        pwrite_all(fd, data, offset)
+                    finally:
+                        if done is not None:
+                            done()
+            fetch = lambda cancel, first, last: self.download_range(client, pool, write, align, cancel, first, last)
+            if self.range_executor is not None:
+                self.run_ranges(self.range_executor, fetch, ranges)
+            else:
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    self.run_ranges(executor, fetch, ranges)
+            if writer is not None:
+                writer.close()
+                writer = None
+            if direct:
+                os.ftruncate(fd, self._size)
+        finally:
+            if writer is not None:
+                writer.close()
+            os.close(fd)
+
+    @staticmethod
+    def run_ranges(executor: ThreadPoolExecutor, fetch: Callable, ranges: List[Tuple[int, int]]) -> None:
+        """Runs fetch(cancel, first, last) for every range on executor.
+
+        On the first failure queued ranges are cancelled and running ones told
+        to stop through the cancel event; the error is re-raised once none of
+        them is still writing.
+        """
+        cancel = threading.Event()
+        futures = [executor.submit(fetch, cancel, first, last) for first, last in ranges]
+        done, pending = futures_wait(futures, return_when=FIRST_EXCEPTION)
+        if pending:
+            cancel.set()
+            for future in pending:
+                future.cancel()
+            futures_wait(pending)
+        for future in done:
+            future.result()
+
+    def range_args(self, first: int, last: int) -> dict:
+        """Returns get_object arguments for bytes first..last (inclusive),
+           pinned to etag once it is known.
+        """
+        args = dict(self.extra_args or {}, Bucket=self.bucket, Key=self.key, Range=f'bytes={first}-{last}')
+        if self.etag is not None:
+            args.setdefault('IfMatch', self.etag)
+        return args
+
+    def check_etag(self, etag: str) -> None:
+        """Pins etag from the first range response when the listing did not
+           provide one, raising if a range response carries another.
+        """
+        if etag is None:
+            return
+        if self.etag is None:
+            self.etag = etag
+        if etag != self.etag:
+            raise IOError(f'{self.key} changed during download, ETag {etag} != {self.etag}')
+
+    def download_range(self, client: botocore.client, pool: BufferPool, write: Callable, align: int, cancel: threading.Event, first: int, last: int) -> None:
+        """Fetches bytes first..last (inclusive) and writes them at their offset,
+           giving up early once cancel is set.
+
+        Like s3transfer, a range that fails on a connection or streaming error
+        is retried, from the first byte not yet written, up to
+        num_download_attempts times. Every GET is pinned to the object's ETag
+        with IfMatch, so a retry can never mix in bytes of a newer version.
+
+        With a pool (O_DIRECT) every chunk is copied into a pooled aligned
+        buffer and write lengths are rounded up to a multiple of align. The
+        buffer is released here until write() takes it over, write() calls
+        done once it is written or failed.
+        """
+        offset = first
+        attempt = 1
+        while True:
+            try:
+                response = client.get_object(**self.range_args(offset, last))
+                body = response['Body']
+                try:
+                    self.check_etag(response.get('ETag'))
+                    while offset <= last and not cancel.is_set():
+                        remaining = last - offset + 1
+                        if pool is None:
+                            data = body.read(min(remaining, STREAM_CHUNK_SIZE))
+                            n = len(data)
+                            done = None
+                        else:
+                            buf = pool.acquire(cancel)
+                            if buf is None:
+                                break
+                            try:
+                                n = read_into(body, buf[:min(remaining, pool.size)])
+                            except BaseException:
+                                pool.release(buf)
+                                raise
+                            padded = -(-n // align) * align
+                            data = buf[:padded]
+                            done = lambda buf=buf: pool.release(buf)
+                        if not n:
+                            if done is not None:
+                                done()
+                            raise IOError(f'Range {first}-{last} of {self.key} ended {remaining} bytes early')
+                        write(data, offset, done)
+                        offset += n
+                        self.progress(n)
+                finally:
+                    body.close()
+                return
+            except S3_RETRYABLE_DOWNLOAD_ERRORS as e:
+                if attempt >= self.transfer_config.num_download_attempts or cancel.is_set():
+                    raise
+                print(f'Retrying range {offset}-{last} of {self.key}')
+                print(e)
+                attempt += 1
+
+    async def start_async(self, client, progress: asyncio.Queue, http=None, signer: botocore.client=None) -> None:
+        """Streams the object to disk with an aiobotocore client.
+
+        Each written chunk is reported as (download, bytes) on the progress
+        queue instead of calling progress() from the event loop directly.
+        Whole-object GETs use the httpx client http on a URL presigned by
+        signer when both are given. Completion is reported once the file is
+        closed.
+        """
+        self._started = time.monotonic()
+        if self._size is not None and self._size > self.range_threshold:
+            await self.download_ranges_async(client, progress)
+        elif http is not None and signer is not None:
+            await self.download_http(http, signer, progress)
+        else:
+            await self.download_single_async(client, progress)
+        self.complete()
+
+    async def download_single_async(self, client, progress: asyncio.Queue) -> None:
+        """Streams the object to disk with one aiobotocore get_object."""
+        response = await client.get_object(Bucket=self.bucket, Key=self.key, **(self.extra_args or {}))
+        if self._size is None:
+            self._size = response['ContentLength']
+        async with response['Body'] as body:
+            async with aiofiles.open(self.filename, 'wb') as f:
+                async for chunk in body.iter_chunks(STREAM_CHUNK_SIZE):
+                    await f.write(chunk)
+                    progress.put_nowait((self, len(chunk)))
+
+    async def download_http(self, http, signer: botocore.client, progress: asyncio.Queue) -> None:
+        """Streams the object from a presigned URL over the shared HTTP/2 client."""
+        url = signer.generate_presigned_url('get_object',
+                                            Params=dict(Bucket=self.bucket, Key=self.key, **(self.extra_args or {})))
+        async with http.stream('GET', url) as response:
+            response.raise_for_status()
+            if self._size is None:
+                self._size = int(response.headers['Content-Length'])
+            async with aiofiles.open(self.filename, 'wb') as f:
+                async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                    await f.write(chunk)
+                    progress.put_nowait((self, len(chunk)))
+
+    async def download_ranges_async(self, client, progress: asyncio.Queue) -> None:
+        """asyncio counterpart of download_ranges: up to max_concurrency range
+           coroutines write into a preallocated file with pwrite.
+        """
+        chunk = self.transfer_config.multipart_chunksize
+        ranges = [(first, min(first + chunk, self._size) - 1) for first in range(0, self._size, chunk)]
+        semaphore = asyncio.Semaphore(self.transfer_config.max_concurrency)
+        cancel = asyncio.Event()
+        fd, _ = self.open_dest()
         try:
-            self._size = client.head_object(Bucket=self.bucket, Key=self.filename).get('ContentLength')
-        except Exception as e:
-            print(f'Failed to retrieve object size: {self.bucket} {self.filename}')
-            print(e)
-        self._started = time.time()
-        client.download_file(Bucket=self.bucket,
-                       Key=self.key,
-                       Filename=self.filename,
-                       ExtraArgs=self.extra_args,
-                       Callback=self.progress)
+            fetches = [asyncio.ensure_future(self.download_range_async(client, semaphore, progress, fd, cancel, *r)) for r in ranges]
+            done, pending = await asyncio.wait(fetches, return_when=asyncio.FIRST_EXCEPTION)
+            if pending:
+                # pwrite keeps running in its executor thread even if its task
+                # is cancelled, so let every range stop at a chunk boundary
+                # before the descriptor is closed
+                cancel.set()
+                await asyncio.wait(pending)
+            for fetch in done:
+                fetch.result()
+        finally:
+            os.close(fd)
+
+    async def download_range_async(self, client, semaphore: asyncio.Semaphore, progress: asyncio.Queue, fd: int, cancel: asyncio.Event, first: int, last: int) -> None:
+        """Streams bytes first..last (inclusive) to their offset, pwrite runs in
+           the default executor so the event loop never blocks on disk. Gives
+           up early once cancel is set.
+
+        Retries from the first byte not yet written on connection and
+        streaming errors and pins every GET to the object's ETag, like
+        download_range.
+        """
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            offset = first
+            attempt = 1
+            while True:
+                if cancel.is_set():
+                    return
+                try:
+                    response = await client.get_object(**self.range_args(offset, last))
+                    async with response['Body'] as body:
+                        self.check_etag(response.get('ETag'))
+                        async for chunk in body.iter_chunks(STREAM_CHUNK_SIZE):
+                            if cancel.is_set():
+                                return
+                            await loop.run_in_executor(None, pwrite_all, fd, chunk, offset)
+                            offset += len(chunk)
+                            progress.put_nowait((self, len(chunk)))
+                    if offset <= last:
+                        raise IOError(f'Range {first}-{last} of {self.key} ended {last - offset + 1} bytes early')
+                    return
+                except ASYNC_RETRYABLE_DOWNLOAD_ERRORS as e:
+                    if attempt >= self.transfer_config.num_download_attempts:
+                        raise
+                    print(f'Retrying range {offset}-{last} of {self.key}')
+                    print(e)
+                    attempt += 1
+
+class ProgressTable:
+    """Struct of arrays holding raw progress counters for every submitted
+       download, one row per slot. Nothing is formatted until a redraw.
+
+    Attributes:
+        ids: List of download ids, indexed by slot, None for a freed slot.
+        transferred: array('Q') of bytes transferred per slot.
+        sizes: array('Q') of object sizes in bytes per slot, 0 while unknown.
+        elapsed: array('d') of seconds spent transferring per slot, as of the last update.
+
+        _free: List of slots released by completed downloads, reused by add().
+    """
+
+    __slots__ = ('ids', 'transferred', 'sizes', 'elapsed', '_free')
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.transferred = array.array('Q')
+        self.sizes = array.array('Q')
+        self.elapsed = array.array('d')
+        self._free: List[int] = []
+
+    def add(self, id: str) -> int:
+        """Claims a row for download id and returns its slot, reusing rows
+           freed by remove(). The table only grows past its current size when
+           more downloads are held at once than ever before. Callers serialize
+           add() and remove() themselves.
+        """
+        if self._free:
+            slot = self._free.pop()
+            self.transferred[slot] = 0
+            self.sizes[slot] = 0
+            self.elapsed[slot] = 0.0
+            self.ids[slot] = id
+            return slot
+        # extend the arrays before ids, readers bound their loop by len(ids)
+        self.transferred.append(0)
+        self.sizes.append(0)
+        self.elapsed.append(0.0)
+        self.ids.append(id)
+        return len(self.ids) - 1
+
+    def remove(self, slot: int) -> None:
+        """Frees slot, its row is no longer displayed."""
+        self.ids[slot] = None
+        self.sizes[slot] = 0
+        self._free.append(slot)
+
+    def update(self, slot: int, id: str, transferred: int, size: int, elapsed: float) -> None:
+        if self.ids[slot] != id:
+            # late poll of a download whose slot was already freed or reused
+            return
+        self.transferred[slot] = transferred
+        self.sizes[slot] = size
+        self.elapsed[slot] = elapsed
+
+    def lines(self) -> List[str]:
+        """Formats one line per download that has reported progress."""
+        lines = []
+        for slot in range(len(self.ids)):
+            size = self.sizes[slot]
+            if not size:
+                continue
+            transferred = self.transferred[slot]
+            elapsed = self.elapsed[slot]
+            percentage = transferred * 100.0 / size
+            transfer_rate = transferred / elapsed * 1e-6 if elapsed > 0 else 0.0
+            lines.append(f'{self.ids[slot]}: transferred {percentage:.2f}%  {transfer_rate:.2f}Mb/s\n')
+        return lines
 
 class ProgressTracker(threading.Thread):
-    """Simple class that accepts a dict and displays formatted output
-       of contents.
+    """Simple class that accepts a ProgressTable and displays formatted
+       output of its rows.
 
     Attributes:
-        to_track: Object of type dict containing information for active downloads
+        to_track: ProgressTable containing counters for submitted downloads
+        poll: Callable run at every tick before redrawing, used to refresh to_track.
+        interval: Float number of seconds between two redraws.
+
+        _changed: Threading.Event set whenever to_track has been updated since the last redraw.
+        _stop_event: Threading.Event set to make the tracker exit.
     """
 
-    def __init__(self, to_track: Dict) -> None:
+    def __init__(self, to_track: ProgressTable, poll: Callable[[], None]=None, interval: float=2.0) -> None:
         super().__init__()
-        self.running = False
         self.to_track = to_track
+        self.poll = poll
+        self.interval = interval
+        self._changed = threading.Event()
+        self._stop_event = threading.Event()
+
+    def update(self) -> None:
+        """Marks to_track as changed so it is redrawn on the next tick."""
+        self._changed.set()
 
     def run(self):
-        self.running = True
-        while self.running:
-            print('Progress:')
-            for uuid, progress in self.to_track.items():
-                print(f'{uuid}: {progress}', flush=True)
-            time.sleep(2)
-            os.system('clear')
-            
+        # wakes every interval, or immediately once stop() is called
+        while not self._stop_event.wait(self.interval):
+            if self.poll is not None:
+                self.poll()
+            if not self._changed.is_set():
+                continue
+            self._changed.clear()
+            lines = [CLEAR_SCREEN, 'Progress:\n']
+            lines.extend(self.to_track.lines())
+            # redraw in place with a single write instead of forking clear
+            sys.stdout.write(''.join(lines))
+            sys.stdout.flush()
+
     def stop(self,timeout=None):
-        self.running = False
+        self._stop_event.set()
         super().join(timeout)
         print(f'ProgressTracker {self.name} joined')
 
@@ -107,54 +643,232 @@ class DownloadManager:
     Attributes:
         client: An botocore.client object for use in connecting to bucket.
         contract: A Contract object containing file download metadata (bucket, key, etc.).
+
+        ready_queue: Bounded queue.Queue feeding the connection pool, so workers are handed downloads at the rate they finish them.
+        feeder: Thread creating Downloads from the started batch and queueing them on ready_queue, None until start().
+        active: Dict mapping download id to each started, not yet complete, Download.
+        progress_table: ProgressTable holding per-slot counters, formatted only by the ProgressTracker.
+
+        _pending: List of submitted Contracts not yet handed to the connection pool.
+        _started: Boolean set by start(), a manager runs a single batch.
+        _lock: Threading.Lock guarding _pending, _started and progress_table slots.
     """
 
-    def __init__(self, max_workers: int=1) -> None:
-        self.download_queue: queue.Queue = queue.Queue()
-        self.ready_queue: queue.Queue = queue.Queue()
-        self.complete_queue: queue.Queue = queue.Queue()
-        self.progress_map: Dict = {}
+    def __init__(self, max_workers: int=None, use_async: bool=None) -> None:
+        """Builds the manager and its connection pool.
 
-        self.connection_pool = ConnectionPool(self.ready_queue, max_workers)
+        max_workers defaults to min(32, cpu_count * 4), like
+        ThreadPoolExecutor: a single connection tops out far below the link
+        speed, so downloads are I/O bound and need many in flight. S3
+        throughput saturates around 12-16 workers on a 10 GbE link, more
+        workers mostly add contention.
+
+        use_async selects the asyncio pool, by default whenever aiobotocore
+        and aiofiles are installed. That pool has no io_uring writer, O_DIRECT,
+        single GET fast path or shared TransferManager, so when USE_URING is
+        configured the default is the threaded pool instead, and asking for
+        both raises ValueError. Without usable liburing bindings USE_URING
+        only prints a warning and is otherwise ignored.
+        """
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 4) * 4)
+        # backpressure: the feeder waits for room instead of queueing the whole batch up front
+        self.ready_queue: queue.Queue = queue.Queue(maxsize=max(64, max_workers * 4))
+        self.progress_table = ProgressTable()
+        self.active: Dict[str, Download] = {}
+
+        # default to the asyncio pool whenever aiobotocore and aiofiles are installed
+        auto = use_async is None
+        if auto:
+            use_async = AsyncConnectionPool is not None
+        if use_async and AsyncConnectionPool is None:
+            raise ImportError('use_async requires aiobotocore and aiofiles')
+        self.connection_pool = (AsyncConnectionPool if use_async else ConnectionPool)(self.ready_queue, max_workers)
+        use_uring = self.connection_pool.use_uring
+        if use_uring and UringWriter is None:
+            print('USE_URING is set but liburing>=2024.5.3,<2026 is not installed, writing with pwrite')
+            use_uring = False
+        if use_async and use_uring:
+            if not auto:
+                raise ValueError('USE_URING is not supported by the asyncio pool, pass use_async=False')
+            print('USE_URING is set, using the threaded connection pool')
+            self.connection_pool = ConnectionPool(self.ready_queue, max_workers)
+        self.transfer_config = self.connection_pool.new_transfer_config()
+        self.client = self.connection_pool.client
+
+        # progress is sampled at this rate, never per chunk
+        self.progress_tracker = ProgressTracker(self.progress_table,
+                                                poll=self.poll_progress,
+                                                interval=self.connection_pool.progress_interval)
+
+        self.feeder = None
+        self._pending: List[Contract] = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    def fill_sizes(self, contracts: List[Contract]) -> None:
+        """Sets the size of every unsized contract from object listings.
+
+        Contracts are grouped per bucket and parent prefix (the key up to its
+        last '/'). Each group is listed with list_objects_v2 under the common
+        prefix of its keys with a '/' delimiter, so the listing never descends
+        into sub-prefixes, and stops as soon as every key of the group has a
+        size or the listing has gone past the last one. N files under one
+        prefix cost about ceil(N/1000) requests instead of N head_object calls,
+        a lone file costs a single request.
+        """
+        groups: Dict[Tuple[str, str], Dict[str, List[Contract]]] = {}
+        for contract in contracts:
+            if contract.size is None:
+                parent = contract.key.rpartition('/')[0]
+                groups.setdefault((contract.bucket, parent), {}).setdefault(contract.key, []).append(contract)
+
+        paginator = self.client.get_paginator('list_objects_v2')
+        for (bucket, _), by_key in groups.items():
+            prefix = os.path.commonprefix(list(by_key))
+            # listings are in key order, nothing after the largest key is wanted
+            last = max(by_key)
+            missing = len(by_key)
+            try:
+                for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter='/'):
+                    contents = page.get('Contents', ())
+                    for obj in contents:
+                        found = by_key.get(obj['Key'])
+                        if found:
+                            for contract in found:
+                                contract.size = obj['Size']
+                                contract.etag = obj['ETag']
+                            missing -= 1
+                    if not missing or (contents and contents[-1]['Key'] >= last):
+                        break
+            except Exception as e:
+                print(f'Failed to list objects: {bucket} {prefix}')
+                print(e)
+
+    def new_download(self, contract: Contract) -> Download:
+        """Returns a Download for contract, reporting completion to mark_complete."""
+        return Download(contract=contract,
+                        transfer_config=self.transfer_config,
+                        range_threshold=self.connection_pool.range_threshold,
+                        use_uring=self.connection_pool.use_uring,
+                        range_executor=self.connection_pool.range_executor,
+                        on_complete=self.mark_complete)
 
     def submit(self, contract: Contract) -> None:
-        """Submit new Contract to Download Manager for remote file."""
-        self.download_queue.put(Download(contract=contract))
-
-    def move_to_complete_queue(self, task: Type[Task]):
-        self.complete_queue.put(task)
-        print(f'Download {task.id} complete.')
-
-    def update_progress_map(self, task: Type[Task]):
-        percentage = round((task._bytes_transferred / task._size) * 100, 2)
-        transfer_rate = round((task._bytes_transferred / (time.time() - task._started)) / 1000000, 2)
-        self.progress_map[task.id] = f'transferred {percentage}%  {transfer_rate}Mb/s'
-
-    def attach_observers(self, task: Type[Task]):
-        observers = [
-            DownloadCompleteObserver(self.move_to_complete_queue),
-            ProgressObserver(self.update_progress_map)
-        ]
-        for ob in observers:
-            task.attach(ob)
-        return task
+        """Submit new Contract to Download Manager for remote file.
+
+        Raises RuntimeError once start() has been called.
+        """
+        with self._lock:
+            self._check_not_started()
+            self._pending.append(contract)
+
+    def submit_all(self, contracts: List[Contract]) -> None:
+        """Submit a batch of Contracts to Download Manager.
+
+        Raises RuntimeError once start() has been called.
+        """
+        with self._lock:
+            self._check_not_started()
+            self._pending.extend(contracts)
+
+    def _check_not_started(self) -> None:
+        # workers exit after the started batch, later contracts would never run
+        if self._started:
+            raise RuntimeError('DownloadManager already started, submit contracts before start()')
+
+    def mark_complete(self, task: Type[Task]):
+        """Forgets a finished download, successful or failed, releasing its
+           progress_table row.
+        """
+        self.active.pop(task.id, None)
+        with self._lock:
+            self.progress_table.remove(task.slot)
+        self.progress_tracker.update()
+        if task.error is None:
+            print(f'Download {task.id} complete.')
+
+    def poll_progress(self) -> None:
+        """Refreshes the progress table for every active download."""
+        for task in list(self.active.values()):
+            self.update_progress_table(task)
+
+    def update_progress_table(self, task: Type[Task]):
+        if task._started is None or not task._size:
+            return
+        self.progress_table.update(task.slot,
+                                   task.id,
+                                   task._bytes_transferred,
+                                   task._size,
+                                   time.monotonic() - task._started)
+        self.progress_tracker.update()
+
+    def put_ready(self, download: Download) -> bool:
+        """Puts download on ready_queue, blocking while the workers are
+           saturated. Returns False if the connection pool was stopped first.
+        """
+        while not self.connection_pool.stop_event.is_set():
+            # short waits so a stop request is noticed while blocked
+            try:
+                self.ready_queue.put(download, timeout=0.25)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def feed(self, contracts: List[Contract]) -> None:
+        """Creates a Download per contract as room frees up in ready_queue,
+           then signals the workers that the batch is over.
+
+        Only the downloads queued or running exist as Download objects and
+        progress_table rows; the rest of the batch waits as Contracts.
+        """
+        for contract in contracts:
+            download = self.new_download(contract)
+            with self._lock:
+                download.slot = self.progress_table.add(download.id)
+            self.active[download.id] = download
+            if not self.put_ready(download):
+                # pool stopped, nothing left to drain
+                return
+        # no further downloads for this batch, let workers exit once drained
+        self.connection_pool.close()
 
     def start(self):
         """Initiates download process.
+
+        Sizes the batch, starts the workers and returns; a feeder thread
+        hands them downloads through the bounded ready_queue. A manager runs
+        one batch: start() may only be called once, and submit() is rejected
+        afterwards.
         """
-        for _ in range(self.download_queue.qsize()):
-            download = self.download_queue.get()
-            # attach observers to download
-            self.attach_observers(download)
-            self.ready_queue.put(download)
+        with self._lock:
+            self._check_not_started()
+            self._started = True
+            contracts, self._pending = self._pending, []
+
+        self.fill_sizes(contracts)
+        # largest first, so a big file never starts last and becomes the tail
+        contracts.sort(key=lambda c: c.size or 0, reverse=True)
 
-        # start progress tracker thread
-        self.progress_tracker = ProgressTracker(self.progress_map)
+        # start progress tracker thread before any worker so updates stream
         self.progress_tracker.start()
 
-        # start connection pool
+        # start connection pool, each worker pulls downloads from ready_queue concurrently
         self.connection_pool.start()
 
+        self.feeder = threading.Thread(target=self.feed, args=(contracts,), daemon=True)
+        self.feeder.start()
+
+    def wait(self, timeout=None) -> None:
+        """Blocks until every ready download has been processed, then stops
+           the progress tracker.
+        """
+        if self.feeder is not None:
+            self.feeder.join(timeout)
+        self.connection_pool.join(timeout)
+        self.progress_tracker.stop()
+
     def stop(self,sig,frame):
             print("Joining threads")
             try:
@@ -0,0 +1,116 @@
+from __future__ import annotations
+import os
+import queue
+import threading
+from typing import TYPE_CHECKING
+
+# written against the Cython liburing bindings (liburing>=2024.5.3,<2026), 2026.x
+# replaced them with a new API that no longer exports io_uring and io_uring_cqe
+from liburing import (io_uring, io_uring_cqe, io_uring_queue_init, io_uring_queue_exit,
+                      io_uring_get_sqe, io_uring_prep_write, io_uring_sqe_set_data64,
+                      io_uring_submit, io_uring_wait_cqe, io_uring_cqe_seen)
+
+if TYPE_CHECKING:
+    from typing import Callable, List, Tuple, Optional
+
+class UringWriter:
+    """Batches positional writes to a single file descriptor through io_uring.
+
+    write() only queues the buffer; a daemon thread prepares up to max_batch
+    write SQEs per io_uring_submit and reaps their completions, so the caller
+    can go back to reading from the network while the kernel writes. The
+    optional done callback runs once the write has completed, so pooled
+    buffers are only reused after the kernel is finished with them. At most
+    max_pending writes wait for submission, write() blocks beyond that, so a
+    disk slower than the network holds back the readers instead of queueing
+    the whole object in memory.
+
+    Attributes:
+        fd: Integer file descriptor every write targets.
+        max_batch: Integer count of writes submitted per io_uring_enter.
+        max_pending: Integer count of writes allowed to wait for submission.
+
+        _pending: Bounded Queue of (data, offset, done) writes waiting for submission, None stops the engine.
+        _error: OSError raised by the first failed write, re-raised by write() and close().
+    """
+
+    def __init__(self, fd: int, max_batch: int=32, max_pending: int=32) -> None:
+        self.fd = fd
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: Optional[OSError] = None
+
+        self._ring = io_uring()
+        self._cqe = io_uring_cqe()
+        io_uring_queue_init(max_batch, self._ring, 0)
+
+        self._engine = threading.Thread(target=self._run, daemon=True)
+        self._engine.start()
+
+    def write(self, data: bytes, offset: int, done: Callable[[], None]=None) -> None:
+        """Queues data to be written at offset, calling done once it completed
+           or, after an earlier write failed, before raising that error.
+           Blocks while max_pending writes are already queued.
+        """
+        if self._error is not None:
+            if done is not None:
+                done()
+            raise self._error
+        self._pending.put((data, offset, done))
+
+    def close(self) -> None:
+        """Waits for every queued write to complete and tears down the ring."""
+        self._pending.put(None)
+        self._engine.join()
+        io_uring_queue_exit(self._ring)
+        if self._error is not None:
+            raise self._error
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._pending.get()]
+            while len(batch) < self.max_batch and batch[-1] is not None:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            if batch:
+                try:
+                    self._submit(batch)
+                except OSError as e:
+                    self._error = self._error or e
+            if stop:
+                return
+
+    def _submit(self, batch: List[Tuple[bytes, int, Callable]]) -> None:
+        try:
+            for index, (data, offset, _) in enumerate(batch):
+                sqe = io_uring_get_sqe(self._ring)
+                io_uring_prep_write(sqe, self.fd, data, len(data), offset)
+                io_uring_sqe_set_data64(sqe, index)
+            io_uring_submit(self._ring)
+        except OSError:
+            # nothing reached the kernel, hand the buffers back
+            for _, _, done in batch:
+                if done is not None:
+                    done()
+            raise
+
+        for _ in batch:
+            io_uring_wait_cqe(self._ring, self._cqe)
+            index, written = self._cqe.user_data, self._cqe.res
+            io_uring_cqe_seen(self._ring, self._cqe)
+            data, offset, done = batch[index]
+            try:
+                if written < 0:
+                    self._error = self._error or OSError(-written, os.strerror(-written))
+                elif written < len(data):
+                    # short write, finish the tail synchronously
+                    os.pwrite(self.fd, data[written:], offset + written)
+            finally:
+                if done is not None:
+                    done()
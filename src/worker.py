@@ -1,12 +1,15 @@
 from __future__ import annotations
+import queue
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 import boto3
+from boto3.s3.transfer import TransferManager
+from botocore.config import Config
 from config import Boto3Config
 
 if TYPE_CHECKING:
-    import queue
-    import botocore
+    from typing import List
 
 class Worker(threading.Thread):
     """Base class for boto3.client threads.
@@ -21,40 +24,114 @@ class Worker(threading.Thread):
 
 class Connection(Worker):
     """boto3.client connection object.
+
+    Every worker submits its downloads to the TransferManager shared by the
+    pool, so part threads and buffers are set up once, not once per file.
     """
 
-    def __init__(self, client: botocore.client, from_queue: queue.Queue, terminate_on: bool) -> None:
+    def __init__(self, manager: TransferManager, from_queue: queue.Queue, stop_event: threading.Event) -> None:
         super().__init__()
-        self.client = client
+        self.manager = manager
         self.from_queue = from_queue
-        self.running = terminate_on
+        self.stop_event = stop_event
 
     def run(self):
-        while self.running and self.from_queue.qsize() > 0:
-            download = self.from_queue.get()
-            download.start(self.client)
-        self.stop()
+        while not self.stop_event.is_set():
+            # short timeout so a stop request is noticed without a sentinel
+            try:
+                download = self.from_queue.get(timeout=0.25)
+            except queue.Empty:
+                continue
+            if download is None:
+                break
+            try:
+                download.start(self.manager)
+            except Exception as e:
+                print(f'Download {download.id} failed: {download.bucket} {download.key}')
+                print(e)
+                download.complete(e)
 
 class ConnectionPool(Boto3Config):
     """Thread-pool like object for storing workers.
+
+    Workers block on task_queue until they receive a None sentinel, queued
+    one per worker by close(), or until stop() sets the shared stop event.
+    A single client, thread-safe for concurrent requests, is shared by every
+    worker and by the download manager.
+
+    Attributes:
+        part_concurrency: Integer count of part threads in the TransferManager, and of byte-range threads in range_executor.
+        range_executor: ThreadPoolExecutor shared by every byte-range download, bounding range GETs pool-wide.
     """
 
     def __init__(self, task_queue: queue.Queue, max_workers: int=1) -> None:
         super().__init__()
-        self.running = True
-        self.worker_pool = [Connection(client=self.new_client(), from_queue=task_queue, terminate_on=self.running) for _ in range(max_workers)]
+        self.task_queue = task_queue
+        self.max_workers = max_workers
+        # parts and ranges of every worker's downloads share these threads
+        self.part_concurrency = max(max_workers, self.max_concurrency)
+        self.stop_event = threading.Event()
+        self.client = self.new_client()
+        self.transfer_manager = None
+        self.range_executor = None
+        self.worker_pool = self.new_workers(task_queue, max_workers)
+
+    def new_workers(self, task_queue: queue.Queue, max_workers: int) -> List[Worker]:
+        """Returns the worker threads that will consume task_queue."""
+        config = self.new_transfer_config(max_concurrency=self.part_concurrency)
+        self.transfer_manager = TransferManager(self.client, config)
+        self.range_executor = ThreadPoolExecutor(max_workers=self.part_concurrency, thread_name_prefix='range')
+        return [Connection(manager=self.transfer_manager, from_queue=task_queue, stop_event=self.stop_event) for _ in range(max_workers)]
 
     def new_client(self):
-        return boto3.client('s3',
-                            region_name=self.region_name,
-                            endpoint_url=self.endpoint_url,
-                            aws_access_key_id=self.access_key,
-                            aws_secret_access_key=self.secret_key)
+        """Returns a client built from its own boto3 Session, not the shared default one.
+
+        The HTTP connection pool is sized for every request that can be in
+        flight at once (botocore defaults to 10): one single GET per worker,
+        plus the TransferManager part threads and the range_executor threads.
+        Retries use the adaptive mode so 503 SlowDown responses back off
+        client-side.
+        """
+        config = Config(max_pool_connections=self.max_workers + 2 * self.part_concurrency,
+                        retries={'max_attempts': 10, 'mode': 'adaptive'},
+                        tcp_keepalive=True,
+                        s3={'addressing_style': 'virtual'})
+        session = boto3.session.Session()
+        return session.client('s3',
+                              config=config,
+                              region_name=self.region_name,
+                              endpoint_url=self.endpoint_url,
+                              aws_access_key_id=self.access_key,
+                              aws_secret_access_key=self.secret_key)
 
     def start(self):
-        self.running = True
         for worker in self.worker_pool:
             worker.start()
 
+    def close(self):
+        """Signals that no more tasks will be queued, workers exit once the queue is drained."""
+        for _ in self.worker_pool:
+            self.task_queue.put(None)
+
+    def join(self, timeout=None):
+        """Blocks until every worker has drained the task queue."""
+        for worker in self.worker_pool:
+            worker.join(timeout)
+        if not any(w.is_alive() for w in self.worker_pool):
+            if self.transfer_manager is not None:
+                self.transfer_manager.shutdown()
+            if self.range_executor is not None:
+                self.range_executor.shutdown()
+
     def stop(self):
-        self.running = False
\ No newline at end of file
+        self.stop_event.set()
+        for _ in self.worker_pool:
+            try:
+                self.task_queue.put_nowait(None)
+            except queue.Full:
+                # workers still see the stop event on their next get timeout
+                break
+        if self.transfer_manager is not None:
+            self.transfer_manager.shutdown(cancel=True)
+        if self.range_executor is not None:
+            self.range_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,127 @@
+import os
+import sys
+import logging  # cache the stdlib module before src/logging is on the path
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from boto3.s3.transfer import TransferConfig
+
+import task
+from contract import Contract
+
+MiB = 1024 * 1024
+
+class FakeBody:
+    """Response body returning zeros, raising error on read number fail_on."""
+
+    def __init__(self, length: int, fail_on: int=None, error: Exception=OSError) -> None:
+        self.remaining = length
+        self.fail_on = fail_on
+        self.error = error
+        self.reads = 0
+
+    def read(self, n: int) -> bytes:
+        self.reads += 1
+        if self.reads == self.fail_on:
+            raise self.error('Connection reset by peer')
+        n = min(n, self.remaining)
+        self.remaining -= n
+        return b'\0' * n
+
+    def close(self) -> None:
+        pass
+
+class FakeClient:
+    """get_object stand-in, the first failures range bodies raise on read
+       number fail_on, every body when failures is None.
+    """
+
+    def __init__(self, fail_on: int=None, failures: int=None, error: Exception=OSError) -> None:
+        self.fail_on = fail_on
+        self.failures = failures
+        self.error = error
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get_object(self, Bucket: str, Key: str, Range: str, **kwargs) -> dict:
+        first, last = map(int, Range[len('bytes='):].split('-'))
+        with self._lock:
+            self.requests.append((Range, kwargs.get('IfMatch')))
+            fail_on = self.fail_on
+            if self.failures is not None:
+                if self.failures:
+                    self.failures -= 1
+                else:
+                    fail_on = None
+        return {'Body': FakeBody(last - first + 1, fail_on, self.error), 'ETag': '"etag"'}
+
+class DownloadRangesTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, 'object')
+        self.executor = ThreadPoolExecutor(8)
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+        self.tmp.cleanup()
+
+    def new_download(self, size: int) -> task.Download:
+        config = TransferConfig(multipart_chunksize=2 * MiB, max_concurrency=4)
+        return task.Download(Contract('bucket', 'key', self.filename, None, size),
+                             transfer_config=config,
+                             range_executor=self.executor)
+
+    def run_ranges(self, download: task.Download, client: FakeClient, direct: bool) -> list:
+        errors = []
+
+        def target():
+            try:
+                download.download_ranges(client)
+            except Exception as e:
+                errors.append(e)
+
+        # tmpfs rejects O_DIRECT, so only the buffer pool path is forced here
+        with mock.patch.object(task, 'DIRECT_IO_THRESHOLD', 0 if direct else 1 << 62), \
+             mock.patch.object(task, 'open_destination', lambda filename, direct: (os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644), direct)):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            thread.join(timeout=30)
+        self.assertFalse(thread.is_alive(), 'download_ranges did not return')
+        return errors
+
+    def test_ranges_written(self) -> None:
+        for direct in (False, True):
+            with self.subTest(direct=direct):
+                download = self.new_download(20 * MiB + 123)
+                self.assertEqual(self.run_ranges(download, FakeClient(), direct), [])
+                self.assertEqual(os.path.getsize(self.filename), 20 * MiB + 123)
+                self.assertEqual(download._bytes_transferred, 20 * MiB + 123)
+
+    def test_failed_range_raises(self) -> None:
+        for direct in (False, True):
+            with self.subTest(direct=direct):
+                download = self.new_download(32 * MiB)
+                errors = self.run_ranges(download, FakeClient(fail_on=2), direct)
+                self.assertEqual(len(errors), 1)
+                self.assertIsInstance(errors[0], OSError)
+
+    def test_failed_range_retried(self) -> None:
+        for direct in (False, True):
+            with self.subTest(direct=direct):
+                download = self.new_download(8 * MiB)
+                client = FakeClient(fail_on=2, failures=1, error=ConnectionResetError)
+                self.assertEqual(self.run_ranges(download, client, direct), [])
+                self.assertEqual(download._bytes_transferred, 8 * MiB)
+                # the retry resumes after the chunk already written, pinned to the first ETag
+                retries = [(r, etag) for r, etag in client.requests if int(r[len('bytes='):].split('-')[0]) % (2 * MiB)]
+                self.assertEqual(len(retries), 1)
+                self.assertEqual(retries[0][1], '"etag"')
+
+if __name__ == '__main__':
+    unittest.main()